@@ -3,21 +3,218 @@
 # GitHub Asset Verification Script
 # GitHub资产验证脚本
 # 依赖: requests, python-dotenv (需提前安装：pip install requests python-dotenv)
+# 可选: pyahocorasick (安装后结构校验单次扫描完成：pip install pyahocorasick)
+#       ijson (REST回退时流式提取提交消息：pip install ijson)
 # =============================================================================
 
 import sys
 import os
+import json
+import logging
+import logging.handlers
+import argparse
+import functools
 import requests
-import base64
 import re
-from typing import Dict, List, Optional, Tuple
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from requests.auth import AuthBase
+from urllib3.util.retry import Retry
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+# ETag缓存文件：{url: {"etag": str, "body": json, "last_modified": str}}
+_ETAG_CACHE_PATH = ".gh_etag_cache.json"
+# 缓存含完整响应体，超出上限时淘汰最久未写入的条目
+_ETAG_CACHE_MAX_ENTRIES = 256
+
+
+# 文件内容直接以原始文本返回，省去Base64编码（4/3体积）与解码
+_RAW_MEDIA_TYPE = "application/vnd.github.raw"
+
+# 速率限制等待上限（秒），超过则放弃等待直接报错
+_RATE_LIMIT_MAX_WAIT = 900
+
+# 统计规则中的数值（整数或小数）
+_NUM_PATTERN = r"(\d+(?:\.\d+)?)"
+
+_GRAPHQL_URL = "https://api.github.com/graphql"
+
+# 仅取默认分支最近N条提交的消息字段，一次请求、一个速率限制点
+_COMMIT_MESSAGES_QUERY = """
+query($owner: String!, $name: String!, $first: Int!) {
+  repository(owner: $owner, name: $name) {
+    defaultBranchRef {
+      target {
+        ... on Commit {
+          history(first: $first) {
+            nodes { message }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+# 后台任务的日志记录先截留在线程局部缓冲中，由消费其结果的线程按步骤顺序回放
+_LOG_CAPTURE = threading.local()
+# 批量验证时各仓库的输出整块写出，避免不同仓库的行相互穿插
+_BATCH_OUTPUT_LOCK = threading.Lock()
+
+
+def _capture_filter(record: logging.LogRecord) -> bool:
+    """当前线程处于截留状态时暂存日志记录而不输出"""
+    records = getattr(_LOG_CAPTURE, "records", None)
+    if records is None:
+        return True
+    records.append(record)
+    return False
+
+
+def _run_with_captured_logs(func: Callable, *args) -> Tuple[Any, List[logging.LogRecord]]:
+    """执行func并截留其间产生的日志记录，返回（结果，日志记录）"""
+    records: List[logging.LogRecord] = []
+    previous = getattr(_LOG_CAPTURE, "records", None)
+    _LOG_CAPTURE.records = records
+    try:
+        result = func(*args)
+    finally:
+        _LOG_CAPTURE.records = previous
+    return result, records
+
+
+def _replay_logs(records: List[logging.LogRecord]) -> None:
+    """按原顺序输出截留的日志记录"""
+    for record in records:
+        logger.handle(record)
+
+
+def _build_logger() -> Tuple[logging.Logger, logging.handlers.MemoryHandler]:
+    """构建验证日志：进度信息缓冲后批量写入stdout，警告/错误直接写入stderr
+
+    logging处理器自带锁，并发验证时单条输出不会交错
+    """
+    formatter = logging.Formatter("%(message)s")
+    stdout_handler = logging.StreamHandler(sys.stdout)
+    stdout_handler.setFormatter(formatter)
+    stdout_handler.addFilter(lambda record: record.levelno < logging.WARNING)
+    # 遇到警告/错误时先冲刷已缓冲的进度信息，保证终端输出顺序
+    buffer_handler = logging.handlers.MemoryHandler(
+        capacity=256, flushLevel=logging.WARNING, target=stdout_handler
+    )
+    stderr_handler = logging.StreamHandler(sys.stderr)
+    stderr_handler.setFormatter(formatter)
+    stderr_handler.setLevel(logging.WARNING)
+
+    verify_logger = logging.getLogger("verify")
+    verify_logger.setLevel(logging.INFO)
+    verify_logger.propagate = False
+    verify_logger.handlers.clear()
+    verify_logger.filters.clear()
+    verify_logger.addFilter(_capture_filter)
+    verify_logger.addHandler(buffer_handler)
+    verify_logger.addHandler(stderr_handler)
+    return verify_logger, buffer_handler
+
+
+logger, _log_buffer = _build_logger()
+
+
+def _load_json_cache(path: str) -> Dict[str, Dict]:
+    """读取本地JSON缓存（文件不存在或损坏时返回空缓存）"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_json_cache(path: str, cache: Dict[str, Dict]) -> None:
+    """原子写入JSON缓存（先写临时文件再os.replace，避免中断导致缓存损坏）"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"[缓存警告] 写入缓存 {path} 失败：{str(e)}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class _JsonFileCache:
+    """进程内JSON缓存：首次访问时从磁盘加载一次，运行结束时整体原子写回，条目数超出上限时按写入顺序淘汰"""
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._entries: Optional[Dict[str, Dict]] = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def _loaded(self) -> Dict[str, Dict]:
+        if self._entries is None:
+            self._entries = _load_json_cache(self.path)
+            self._prune()
+        return self._entries
+
+    def _prune(self) -> None:
+        while len(self._entries) > self.max_entries:
+            self._entries.pop(next(iter(self._entries)))
+            self._dirty = True
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            return self._loaded().get(key)
+
+    def set(self, key: str, value: Dict) -> None:
+        with self._lock:
+            entries = self._loaded()
+            entries.pop(key, None)
+            entries[key] = value
+            self._dirty = True
+            self._prune()
+
+    def save(self) -> None:
+        """有改动时写回磁盘"""
+        with self._lock:
+            if self._entries is None or not self._dirty:
+                return
+            _save_json_cache(self.path, self._entries)
+            self._dirty = False
+
+
+_ETAG_CACHE = _JsonFileCache(_ETAG_CACHE_PATH, _ETAG_CACHE_MAX_ENTRIES)
+
+
+def save_caches() -> None:
+    """将进程内缓存写回磁盘（每次验证运行结束时调用一次）"""
+    _ETAG_CACHE.save()
 
 
 def load_environment() -> Tuple[Optional[str], Optional[str]]:
-    """加载环境变量：GitHub访问令牌和目标组织/用户名"""
+    """加载环境变量：GitHub访问令牌和目标组织/用户名
+
+    MCP_GITHUB_TOKENS 可配置逗号分隔的多个令牌（轮换使用），未配置时回退 MCP_GITHUB_TOKEN
+    """
     load_dotenv(".mcp_env")
-    github_token = os.environ.get("MCP_GITHUB_TOKEN")
+    github_token = os.environ.get("MCP_GITHUB_TOKENS") or os.environ.get("MCP_GITHUB_TOKEN")
     github_org = os.environ.get("GITHUB_EVAL_ORG")
     return github_token, github_org
 
@@ -26,113 +223,372 @@ def build_headers(github_token: str) -> Dict[str, str]:
     """构建GitHub API请求头（含授权信息）"""
     return {
         "Authorization": f"Bearer {github_token}",
-        "Accept": "application/vnd.github.v3+json"
+        "Accept": "application/vnd.github.v3+json",
+        "Accept-Encoding": "gzip"
     }
 
 
-def call_github_api(
+class _RateLimitExhausted(requests.RequestException):
+    """所有令牌额度耗尽且等待超过上限；在令牌选择阶段抛出，请求不会发出"""
+
+
+class _RotatingTokenAuth(AuthBase):
+    """按请求轮换GitHub令牌并记录各令牌的额度重置时间
+
+    额度耗尽的令牌在重置前被跳过；全部耗尽时才在下一次请求发出前等待最早的重置，
+    等待超过上限时抛出_RateLimitExhausted
+    """
+
+    def __init__(self, tokens: List[str]):
+        self._tokens = list(tokens)
+        self._reset_at = {token: 0.0 for token in tokens}
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def mark_exhausted(self, authorization: str, reset_at: float) -> None:
+        """记录某令牌（Authorization头）额度耗尽，直到reset_at（epoch秒）"""
+        token = authorization[len("Bearer "):] if authorization.startswith("Bearer ") else authorization
+        with self._lock:
+            if token in self._reset_at:
+                self._reset_at[token] = max(self._reset_at[token], reset_at)
+
+    def _acquire(self) -> str:
+        with self._lock:
+            now = time.time()
+            for offset in range(len(self._tokens)):
+                index = (self._next + offset) % len(self._tokens)
+                token = self._tokens[index]
+                if self._reset_at[token] <= now:
+                    self._next = index + 1
+                    return token
+            token = min(self._tokens, key=self._reset_at.__getitem__)
+            wait = self._reset_at[token] - now
+        if wait > _RATE_LIMIT_MAX_WAIT:
+            raise _RateLimitExhausted(
+                f"所有令牌额度耗尽，需等待 {int(wait)} 秒，超过上限 {_RATE_LIMIT_MAX_WAIT} 秒，放弃请求"
+            )
+        logger.warning(f"[速率限制] 所有令牌额度耗尽，等待 {int(wait)} 秒...")
+        time.sleep(wait)
+        return token
+
+    def __call__(self, request: requests.PreparedRequest) -> requests.PreparedRequest:
+        request.headers["Authorization"] = f"Bearer {self._acquire()}"
+        return request
+
+
+def build_session(github_token: str, pool_maxsize: int = 10) -> requests.Session:
+    """构建复用连接池的GitHub API会话（HTTP keep-alive，网关错误自动重试）
+
+    github_token 含逗号分隔的多个令牌时按请求轮换使用；单令牌同样经会话认证跟踪额度重置
+    """
+    tokens = [token.strip() for token in github_token.split(",") if token.strip()]
+    session = requests.Session()
+    session.headers.update(build_headers(tokens[0]))
+    session.auth = _RotatingTokenAuth(tokens)
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504])
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=retry))
+    return session
+
+
+def _rate_limit_reset_at(response: requests.Response) -> Optional[float]:
+    """根据速率限制响应头计算令牌额度恢复的时间点（epoch秒）；额度未耗尽时返回None"""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after and response.status_code in (403, 429):
+        try:
+            return time.time() + float(retry_after)
+        except ValueError:
+            return None
+    try:
+        remaining = int(response.headers.get("X-RateLimit-Remaining", "1"))
+        reset = int(response.headers.get("X-RateLimit-Reset", "0"))
+    except ValueError:
+        return None
+    if remaining == 0:
+        return reset + 1
+    return None
+
+
+def _send_with_rate_limit(
+    session: requests.Session,
+    send: Callable[[], requests.Response]
+) -> requests.Response:
+    """发送请求并遵守速率限制：记录耗尽令牌的重置时间（由下一次请求前的令牌选择负责等待）；403/429限流时重试一次
+
+    成功响应即使报告额度耗尽也立即返回，不阻塞当前调用
+    """
+    response = send()
+    reset_at = _rate_limit_reset_at(response)
+    if reset_at is None:
+        return response
+    request = getattr(response, "request", None)
+    rotating_auth = isinstance(session.auth, _RotatingTokenAuth)
+    if rotating_auth and request is not None:
+        session.auth.mark_exhausted(request.headers.get("Authorization", ""), reset_at)
+    if response.status_code not in (403, 429):
+        return response
+
+    # 先释放限流响应占用的连接（stream=True时不会自动归还连接池）
+    response.close()
+    if not rotating_auth:
+        wait = reset_at - time.time()
+        if wait > _RATE_LIMIT_MAX_WAIT:
+            logger.warning(f"[速率限制] 需等待 {int(wait)} 秒，超过上限 {_RATE_LIMIT_MAX_WAIT} 秒，放弃等待")
+        elif wait > 0:
+            logger.warning(f"[速率限制] 额度不足，等待 {int(wait)} 秒...")
+            time.sleep(wait)
+    return send()
+
+
+def _etag_cache_key(
     endpoint: str,
-    headers: Dict[str, str],
     org: str,
-    repo: str
-) -> Tuple[bool, Optional[Dict]]:
-    """调用GitHub API并返回（请求状态，响应数据）"""
+    repo: str,
+    media_type: Optional[str] = None
+) -> Tuple[str, str]:
+    """返回（请求URL，ETag缓存键）；不同media_type的响应体分开缓存"""
     url = f"https://api.github.com/repos/{org}/{repo}/{endpoint}"
+    return url, f"{url}#{media_type}" if media_type else url
+
+
+def call_github_api(
+    endpoint: str,
+    session: requests.Session,
+    org: str,
+    repo: str,
+    media_type: Optional[str] = None
+) -> Tuple[bool, Optional[Any]]:
+    """调用GitHub API并返回（请求状态，响应数据）
+
+    使用ETag条件请求：命中304时直接返回本地缓存的响应体（304不计入主速率限制）
+    指定media_type时覆盖Accept头，并以UTF-8文本形式返回响应体（非UTF-8内容抛出UnicodeDecodeError，由调用方报告）
+    """
+    url, cache_key = _etag_cache_key(endpoint, org, repo, media_type)
+    entry = _ETAG_CACHE.get(cache_key)
+    request_headers = {"Accept": media_type} if media_type else {}
+    if entry:
+        if entry.get("etag"):
+            request_headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            request_headers["If-Modified-Since"] = entry["last_modified"]
     try:
-        response = requests.get(url, headers=headers)
+        response = _send_with_rate_limit(
+            session, lambda: session.get(url, headers=request_headers, timeout=(3, 10))
+        )
+        if response.status_code == 304 and entry:
+            return True, entry.get("body")
         if response.status_code == 200:
-            return True, response.json()
+            body = response.content.decode("utf-8") if media_type else response.json()
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if etag or last_modified:
+                _ETAG_CACHE.set(cache_key, {"etag": etag, "body": body, "last_modified": last_modified})
+            return True, body
         elif response.status_code == 404:
-            print(f"[API提示] {endpoint} 资源未找到（404）", file=sys.stderr)
+            logger.warning(f"[API提示] {endpoint} 资源未找到（404）")
             return False, None
         else:
-            print(f"[API错误] {endpoint} 状态码：{response.status_code}", file=sys.stderr)
+            logger.error(f"[API错误] {endpoint} 状态码：{response.status_code}")
+            return False, None
+    except UnicodeDecodeError:
+        raise
+    except Exception as e:
+        logger.error(f"[API异常] 调用 {endpoint} 失败：{str(e)}")
+        return False, None
+
+
+def call_github_graphql(
+    query: str,
+    variables: Dict,
+    session: requests.Session
+) -> Tuple[bool, Optional[Dict]]:
+    """调用GitHub GraphQL API并返回（请求状态，data字段）"""
+    try:
+        response = _send_with_rate_limit(
+            session, lambda: session.post(
+                _GRAPHQL_URL, json={"query": query, "variables": variables}, timeout=(3, 10)
+            )
+        )
+        if response.status_code != 200:
+            logger.error(f"[GraphQL错误] 状态码：{response.status_code}")
             return False, None
+        result = response.json()
+        if result.get("errors"):
+            messages = "; ".join(err.get("message", "") for err in result["errors"])
+            logger.error(f"[GraphQL错误] {messages}")
+            return False, None
+        return True, result.get("data")
     except Exception as e:
-        print(f"[API异常] 调用 {endpoint} 失败：{str(e)}", file=sys.stderr)
+        logger.error(f"[GraphQL异常] 调用失败：{str(e)}")
         return False, None
 
 
 def get_repo_file_content(
     file_path: str,
-    headers: Dict[str, str],
+    session: requests.Session,
     org: str,
     repo: str,
-    branch: str = "main"
+    branch: str = "main",
+    file_cache: Optional[Dict[Tuple[str, str, str, str], str]] = None
 ) -> Optional[str]:
-    """获取指定分支下的文件内容（Base64解码）"""
-    success, result = call_github_api(
-        f"contents/{file_path}?ref={branch}", headers, org, repo
-    )
+    """获取指定分支下的文件内容（原始文本；传入file_cache时在本次运行内按(org, repo, file_path, branch)复用成功结果）"""
+    cache_key = (org, repo, file_path, branch)
+    if file_cache is not None and cache_key in file_cache:
+        return file_cache[cache_key]
+
+    try:
+        success, result = call_github_api(
+            f"contents/{file_path}?ref={branch}", session, org, repo, _RAW_MEDIA_TYPE
+        )
+    except UnicodeDecodeError as e:
+        logger.error(f"[文件解码错误] {file_path}：{str(e)}")
+        return None
     if not success or not result:
         return None
+    # 仅记录成功结果，失败的文件在下次调用时重新请求
+    if file_cache is not None:
+        file_cache[cache_key] = result
+    return result
+
 
+def fetch_rest_commit_messages(
+    session: requests.Session,
+    org: str,
+    repo: str,
+    max_commits: int = 10
+) -> Optional[List[str]]:
+    """经REST接口获取最近提交的消息（有ijson时流式仅提取commit.message，不构建完整JSON树）"""
+    url = f"https://api.github.com/repos/{org}/{repo}/commits?per_page={max_commits}"
     try:
-        return base64.b64decode(result.get("content", "")).decode("utf-8")
+        response = _send_with_rate_limit(
+            session, lambda: session.get(url, stream=True, timeout=(3, 10))
+        )
+        with response:
+            if response.status_code != 200:
+                logger.error(f"[API错误] commits 状态码：{response.status_code}")
+                return None
+            if ijson is None:
+                return [commit["commit"]["message"] for commit in response.json()]
+            response.raw.decode_content = True
+            return list(ijson.items(response.raw, "item.commit.message"))
     except Exception as e:
-        print(f"[文件解码错误] {file_path}：{str(e)}", file=sys.stderr)
+        logger.error(f"[API异常] 调用 commits 失败：{str(e)}")
         return None
 
 
 def search_commits(
-    headers: Dict[str, str],
+    session: requests.Session,
     org: str,
     repo: str,
     commit_msg_pattern: str,
     max_commits: int = 10
 ) -> bool:
-    """搜索包含指定消息模式的提交记录（支持模糊匹配）"""
-    success, commits = call_github_api(
-        f"commits?per_page={max_commits}", headers, org, repo
+    """搜索包含指定消息模式的提交记录（支持模糊匹配，经GraphQL仅拉取提交消息，失败时回退REST）"""
+    pattern = re.compile(commit_msg_pattern, re.IGNORECASE)
+    success, data = call_github_graphql(
+        _COMMIT_MESSAGES_QUERY,
+        {"owner": org, "name": repo, "first": max_commits},
+        session
     )
-    if not success:
-        return False
+    if not success or not data:
+        logger.warning(f"[GraphQL提示] 回退REST接口获取提交记录")
+        messages = fetch_rest_commit_messages(session, org, repo, max_commits)
+        if messages is None:
+            return False
+        return any(pattern.search(message) for message in messages)
 
-    for commit in commits:
-        if re.search(commit_msg_pattern, commit["commit"]["message"], re.IGNORECASE):
-            return True
-    return False
+    try:
+        nodes = data["repository"]["defaultBranchRef"]["target"]["history"]["nodes"]
+    except (KeyError, TypeError):
+        logger.warning(f"[GraphQL提示] {org}/{repo} 未找到默认分支提交历史")
+        return False
+    return any(pattern.search(node["message"]) for node in (nodes or []))
 
 
 def verify_file_existence(
     config: Dict,
-    headers: Dict[str, str],
+    session: requests.Session,
     org: str,
-    repo: str
+    repo: str,
+    file_cache: Optional[Dict[Tuple[str, str, str, str], str]] = None
 ) -> Tuple[bool, Optional[str]]:
     """验证目标文件是否存在于指定分支"""
     file_path = config["target_file"]["path"]
     branch = config["target_file"]["branch"]
-    print(f"[1/4] 验证文件存在性：{file_path}（分支：{branch}）...")
+    logger.info(f"[1/4] 验证文件存在性：{file_path}（分支：{branch}）...")
     
-    content = get_repo_file_content(file_path, headers, org, repo, branch)
+    content = get_repo_file_content(file_path, session, org, repo, branch, file_cache)
     if not content:
-        print(f"[错误] 文件 {file_path} 在 {branch} 分支中未找到", file=sys.stderr)
+        logger.error(f"[错误] 文件 {file_path} 在 {branch} 分支中未找到")
         return False, None
-    print(f"[成功] 文件 {file_path} 存在")
+    logger.info(f"[成功] 文件 {file_path} 存在")
     return True, content
 
 
+def _find_structures_regex(content: str, structures: List[str]) -> set:
+    """以单个正则交替式在C层一次扫描content（无pyahocorasick时的回退实现）"""
+    needles = sorted({struct for struct in structures if struct}, key=len, reverse=True)
+    if not needles:
+        return set(structures)
+    pattern = re.compile("|".join(re.escape(struct) for struct in needles))
+    found = {match.group(0) for match in pattern.finditer(content)}
+    if "" in structures:
+        found.add("")
+    # finditer不返回重叠匹配，被其他结构覆盖的少量漏网项再逐个确认
+    found.update(struct for struct in needles if struct not in found and struct in content)
+    return found
+
+
+def find_structures(content: str, structures: List[str]) -> set:
+    """返回content中出现的结构集合（有pyahocorasick时单次扫描且全部命中即停止，否则用正则交替式扫描）"""
+    if not structures:
+        return set()
+    if ahocorasick is None:
+        return _find_structures_regex(content, structures)
+
+    automaton = ahocorasick.Automaton()
+    for struct in structures:
+        if struct:
+            automaton.add_word(struct, struct)
+    if len(automaton) == 0:
+        return set(structures)
+    automaton.make_automaton()
+    found = {""} if "" in structures else set()
+    remaining = len(set(structures) - found)
+    for _, struct in automaton.iter(content):
+        if struct not in found:
+            found.add(struct)
+            remaining -= 1
+            if remaining == 0:
+                break
+    return found
+
+
 def verify_file_structure(
     content: str,
     config: Dict
 ) -> bool:
     """验证文件是否包含必需的结构（如章节、关键词、表格头部）"""
     required_structures = config["required_structures"]
-    print(f"[2/4] 验证文件结构：共需包含 {len(required_structures)} 个必需结构...")
+    logger.info(f"[2/4] 验证文件结构：共需包含 {len(required_structures)} 个必需结构...")
     
-    missing = []
-    for struct in required_structures:
-        if struct not in content:
-            missing.append(struct)
+    found = find_structures(content, required_structures)
+    missing = [struct for struct in required_structures if struct not in found]
     
     if missing:
-        print(f"[错误] 缺失必需结构：{', '.join(missing)}", file=sys.stderr)
+        logger.error(f"[错误] 缺失必需结构：{', '.join(missing)}")
         return False
-    print(f"[成功] 所有必需结构均存在")
+    logger.info(f"[成功] 所有必需结构均存在")
     return True
 
 
+@functools.lru_cache(maxsize=128)
+def _stat_line_pattern(target: str) -> "re.Pattern[str]":
+    """编译并缓存统计规则的行锚定正则：匹配含target的行中的首个数值"""
+    return re.compile(
+        rf"^(?=[^\n]*?{re.escape(target)})[^\d\n]*{_NUM_PATTERN}", re.MULTILINE
+    )
+
+
 def verify_content_accuracy(
     content: str,
     config: Dict
@@ -140,13 +596,26 @@ def verify_content_accuracy(
     """验证文件内容是否符合预期规则（如统计数据、正则匹配、枚举值）"""
     content_rules = config["content_rules"]
     if not content_rules:
-        print(f"[3/4 跳过] 未配置内容验证规则，直接通过")
+        logger.info(f"[3/4 跳过] 未配置内容验证规则，直接通过")
         return True
     
-    print(f"[3/4] 验证内容准确性：共需校验 {len(content_rules)} 条规则...")
-    lines = content.split("\n")
-    
+    logger.info(f"[3/4] 验证内容准确性：共需校验 {len(content_rules)} 条规则...")
+    # 正则规则在循环外统一预编译
+    regex_patterns = {
+        idx: re.compile(rule["expected"])
+        for idx, rule in enumerate(content_rules)
+        if rule["type"] == "regex_match"
+    }
+    # 统计规则：直接在全文上按行锚定扫描，建立 {target: {所在行首个数值}} 索引（不拆分行列表）
+    stat_hits: Dict[str, set] = {}
     for rule in content_rules:
+        target = rule["target"]
+        if rule["type"] == "stat_match" and target not in stat_hits:
+            stat_hits[target] = {
+                match.group(1) for match in _stat_line_pattern(target).finditer(content)
+            }
+    
+    for idx, rule in enumerate(content_rules):
         rule_type = rule["type"]
         target = rule["target"]
         expected = rule["expected"]
@@ -154,18 +623,12 @@ def verify_content_accuracy(
         
         # 统计数据匹配
         if rule_type == "stat_match":
-            for line in lines:
-                if target in line:
-                    match = re.search(r"(\d+(?:\.\d+)?)", line)
-                    if match and str(match.group(1)) == str(expected):
-                        matched = True
-                        break
-                if matched:
-                    break
+            if str(expected) in stat_hits[target]:
+                matched = True
         
         # 正则匹配
         elif rule_type == "regex_match":
-            if re.search(expected, content):
+            if regex_patterns[idx].search(content):
                 matched = True
         
         # 固定文本匹配
@@ -174,90 +637,193 @@ def verify_content_accuracy(
                 matched = True
         
         if not matched:
-            print(f"[错误] 内容规则校验失败：{target} 预期 {expected}，实际未匹配", file=sys.stderr)
+            logger.error(f"[错误] 内容规则校验失败：{target} 预期 {expected}，实际未匹配")
             return False
     
-    print(f"[成功] 所有内容规则校验通过")
+    logger.info(f"[成功] 所有内容规则校验通过")
     return True
 
 
 def verify_commit_record(
     config: Dict,
-    headers: Dict[str, str],
+    session: requests.Session,
     org: str,
-    repo: str
+    repo: str,
+    commit_search: Optional["Future[Tuple[bool, List[logging.LogRecord]]]"] = None
 ) -> bool:
-    """验证仓库是否存在符合预期的提交记录"""
+    """验证仓库是否存在符合预期的提交记录（commit_search为已提交的并发搜索任务时取其结果并回放其日志）"""
     commit_config = config["commit_verification"]
     if not commit_config:
-        print(f"[4/4 跳过] 未配置提交验证规则，直接通过")
+        logger.info(f"[4/4 跳过] 未配置提交验证规则，直接通过")
         return True
     
     commit_msg_pattern = commit_config["msg_pattern"]
     max_commits = commit_config.get("max_commits", 10)
-    print(f"[4/4] 验证提交记录：搜索包含「{commit_msg_pattern}」的最近 {max_commits} 条提交...")
+    logger.info(f"[4/4] 验证提交记录：搜索包含「{commit_msg_pattern}」的最近 {max_commits} 条提交...")
     
-    found = search_commits(headers, org, repo, commit_msg_pattern, max_commits)
+    if commit_search is not None:
+        found, records = commit_search.result()
+        _replay_logs(records)
+    else:
+        found = search_commits(session, org, repo, commit_msg_pattern, max_commits)
     if not found:
-        print(f"[错误] 未找到符合要求的提交记录", file=sys.stderr)
+        logger.error(f"[错误] 未找到符合要求的提交记录")
         return False
-    print(f"[成功] 找到符合要求的提交记录")
+    logger.info(f"[成功] 找到符合要求的提交记录")
     return True
 
 
-def run_verification(verification_config: Dict) -> bool:
-    """执行完整验证流程：环境检查 → 文件存在 → 结构验证 → 内容验证 → 提交验证"""
-    print("=" * 50)
-    print("开始执行GitHub资产验证")
-    print("=" * 50)
-    
-    # 环境检查
+def check_environment() -> Optional[Tuple[str, str]]:
+    """加载并检查环境变量，缺失时输出错误并返回None"""
     github_token, github_org = load_environment()
-    if not github_token:
-        print(f"[环境错误] 未配置MCP_GITHUB_TOKEN（需在.mcp_env中设置）", file=sys.stderr)
-        return False
+    if not github_token or not github_token.replace(",", "").strip():
+        logger.error(f"[环境错误] 未配置MCP_GITHUB_TOKEN或MCP_GITHUB_TOKENS（需在.mcp_env中设置）")
+        return None
     if not github_org:
-        print(f"[环境错误] 未配置GITHUB_EVAL_ORG（需在.mcp_env中设置）", file=sys.stderr)
-        return False
-    
+        logger.error(f"[环境错误] 未配置GITHUB_EVAL_ORG（需在.mcp_env中设置）")
+        return None
+    return github_token, github_org
+
+
+def run_verification_one(
+    verification_config: Dict,
+    session: requests.Session,
+    github_org: str,
+    file_cache: Optional[Dict[Tuple[str, str, str, str], str]] = None
+) -> bool:
+    """对单个仓库执行验证：文件存在 → 结构验证 → 内容验证 → 提交验证"""
     repo_name = verification_config["target_repo"]
-    headers = build_headers(github_token)
-    print(f"[环境就绪] 目标仓库：{github_org}/{repo_name}\n")
+    logger.info(f"[环境就绪] 目标仓库：{github_org}/{repo_name}\n")
 
-    # 文件存在性验证
-    file_exists, file_content = verify_file_existence(verification_config, headers, github_org, repo_name)
-    if not file_exists:
-        return False
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        # 提交搜索与文件获取互不依赖，提前并发发起；其日志截留到第4步再输出
+        commit_search = None
+        commit_config = verification_config.get("commit_verification")
+        if commit_config:
+            commit_search = executor.submit(
+                _run_with_captured_logs, search_commits, session, github_org, repo_name,
+                commit_config["msg_pattern"], commit_config.get("max_commits", 10)
+            )
+
+        # 文件存在性验证
+        file_exists, file_content = verify_file_existence(
+            verification_config, session, github_org, repo_name, file_cache
+        )
+        if not file_exists:
+            return False
 
-    # 文件结构验证
-    structure_valid = verify_file_structure(file_content, verification_config)
-    if not structure_valid:
-        return False
+        # 文件结构验证
+        structure_valid = verify_file_structure(file_content, verification_config)
+        if not structure_valid:
+            return False
 
-    # 内容准确性验证
-    content_valid = verify_content_accuracy(file_content, verification_config)
-    if not content_valid:
-        return False
+        # 内容准确性验证
+        content_valid = verify_content_accuracy(file_content, verification_config)
+        if not content_valid:
+            return False
 
-    # 提交记录验证
-    commit_valid = verify_commit_record(verification_config, headers, github_org, repo_name)
-    if not commit_valid:
-        return False
+        # 提交记录验证
+        commit_valid = verify_commit_record(verification_config, session, github_org, repo_name, commit_search)
+        if not commit_valid:
+            return False
+    finally:
+        # 提前返回时取消未开始的提交搜索，且不等待进行中的搜索
+        executor.shutdown(wait=False, cancel_futures=True)
 
     # 所有步骤通过
-    print("\n" + "=" * 50)
-    print("? 所有验证步骤通过！")
-    print(f"验证对象：{verification_config['target_file']['path']}")
-    print(f"目标仓库：{github_org}/{repo_name}")
-    print(f"验证分支：{verification_config['target_file']['branch']}")
-    print(f"通过规则：4/4")
+    logger.info("\n" + "=" * 50)
+    logger.info("? 所有验证步骤通过！")
+    logger.info(f"验证对象：{verification_config['target_file']['path']}")
+    logger.info(f"目标仓库：{github_org}/{repo_name}")
+    logger.info(f"验证分支：{verification_config['target_file']['branch']}")
+    logger.info(f"通过规则：4/4")
     if verification_config.get("commit_verification"):
-        print(f"匹配提交：{verification_config['commit_verification']['msg_pattern']}")
-    print("=" * 50)
+        logger.info(f"匹配提交：{verification_config['commit_verification']['msg_pattern']}")
+    logger.info("=" * 50)
     return True
 
 
+def run_verification(verification_config: Dict) -> bool:
+    """执行完整验证流程：环境检查 → 文件存在 → 结构验证 → 内容验证 → 提交验证"""
+    logger.info("=" * 50)
+    logger.info("开始执行GitHub资产验证")
+    logger.info("=" * 50)
+    
+    # 环境检查
+    try:
+        environment = check_environment()
+        if environment is None:
+            return False
+        github_token, github_org = environment
+        
+        with build_session(github_token) as session:
+            return run_verification_one(verification_config, session, github_org)
+    finally:
+        save_caches()
+        _log_buffer.flush()
+
+
+def _run_verification_isolated(
+    verification_config: Dict,
+    session: requests.Session,
+    github_org: str,
+    file_cache: Dict[Tuple[str, str, str, str], str]
+) -> bool:
+    """批量模式下验证单个仓库：输出截留后整块写出，单个配置抛出异常时记为失败而不影响其他仓库"""
+    def run() -> bool:
+        try:
+            return run_verification_one(verification_config, session, github_org, file_cache)
+        except Exception as e:
+            repo_name = verification_config.get("target_repo", "?")
+            logger.error(f"[验证异常] {github_org}/{repo_name}：{type(e).__name__}: {str(e)}")
+            return False
+
+    result, records = _run_with_captured_logs(run)
+    with _BATCH_OUTPUT_LOCK:
+        _replay_logs(records)
+    return result
+
+
+def run_verification_batch(
+    verification_configs: List[Dict],
+    max_workers: int = 8
+) -> List[bool]:
+    """并发验证多个仓库（共享同一会话连接池），返回与配置顺序一致的结果列表"""
+    logger.info("=" * 50)
+    logger.info(f"开始执行GitHub资产批量验证：共 {len(verification_configs)} 个仓库")
+    logger.info("=" * 50)
+    
+    # 环境检查
+    try:
+        environment = check_environment()
+        if environment is None:
+            return [False] * len(verification_configs)
+        github_token, github_org = environment
+        
+        # 本批次内多个配置指向同一文件时只拉取一次，批次结束即丢弃
+        file_cache: Dict[Tuple[str, str, str, str], str] = {}
+        # 每个仓库内部另有文件/提交两路并发请求；会话随批次结束关闭，释放连接池
+        with build_session(github_token, pool_maxsize=max_workers * 2) as session, \
+                ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(
+                lambda config: _run_verification_isolated(config, session, github_org, file_cache),
+                verification_configs
+            ))
+        
+        logger.info(f"\n批量验证完成：{sum(results)}/{len(results)} 个仓库通过")
+        return results
+    finally:
+        save_caches()
+        _log_buffer.flush()
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="GitHub资产验证")
+    parser.add_argument("--quiet", action="store_true", help="仅输出警告和错误信息")
+    if parser.parse_args().quiet:
+        logger.setLevel(logging.WARNING)
+
     # ==========================
     # 验证配置（根据实际需求修改）
     # ==========================
@@ -0,0 +1,491 @@
+import importlib.util
+import json
+import os
+import tempfile
+import unittest
+
+SCRIPT_PATH = os.path.join(os.path.dirname(__file__), "..", "scripts", "verification-config.py")
+spec = importlib.util.spec_from_file_location("verification_config", SCRIPT_PATH)
+verification_config = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(verification_config)
+
+
+class VerificationTestMixin:
+    """公共测试工具：替换模块属性、截获验证日志、记录sleep调用"""
+
+    def patch(self, name, value, target=verification_config):
+        original = getattr(target, name)
+        setattr(target, name, value)
+        self.addCleanup(setattr, target, name, original)
+
+    def capture_logs(self, level=verification_config.logging.NOTSET):
+        messages = []
+        handler = verification_config.logging.Handler(level)
+        handler.emit = lambda record: messages.append(record.getMessage())
+        verification_config.logger.addHandler(handler)
+        self.addCleanup(verification_config.logger.removeHandler, handler)
+        return messages
+
+    def record_sleeps(self):
+        sleeps = []
+        self.patch("sleep", sleeps.append, target=verification_config.time)
+        return sleeps
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, body=None, headers=None):
+        self.status_code = status_code
+        self._body = body
+        self.headers = headers or {}
+        self.closed = False
+
+    def json(self):
+        return self._body
+
+    def close(self):
+        self.closed = True
+
+
+class FakeApiSession:
+    """依次返回预设响应并记录请求头的REST假会话"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.sent_headers = []
+        self.auth = None
+
+    def get(self, url, headers=None, **kwargs):
+        self.sent_headers.append(dict(headers or {}))
+        return self.responses.pop(0)
+
+
+class JsonFileCacheTest(VerificationTestMixin, unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.tmp_dir = tmp_dir.name
+        self.path = os.path.join(self.tmp_dir, "cache.json")
+
+    def test_oldest_written_entry_is_evicted(self):
+        cache = verification_config._JsonFileCache(self.path, 2)
+        cache.set("a", {"n": 1})
+        cache.set("b", {"n": 2})
+        cache.set("a", {"n": 3})
+        cache.set("c", {"n": 4})
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), {"n": 3})
+        self.assertEqual(cache.get("c"), {"n": 4})
+
+    def test_oversized_file_is_pruned_on_load(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"a": {}, "b": {}, "c": {}}, f)
+        cache = verification_config._JsonFileCache(self.path, 2)
+        self.assertIsNone(cache.get("a"))
+        cache.save()
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(list(json.load(f)), ["b", "c"])
+
+    def test_save_caches_replaces_file_atomically(self):
+        self.patch("_ETAG_CACHE", verification_config._JsonFileCache(self.path, 16))
+        verification_config._ETAG_CACHE.set("url", {"etag": "\"v1\"", "body": "# 报告"})
+        verification_config.save_caches()
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f), {"url": {"etag": "\"v1\"", "body": "# 报告"}})
+        self.assertEqual(os.listdir(self.tmp_dir), ["cache.json"])
+
+    def test_failed_replace_keeps_previous_file(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"url": {"etag": "\"v1\""}}, f)
+
+        def failing_replace(src, dst):
+            raise OSError("disk full")
+
+        self.patch("replace", failing_replace, target=verification_config.os)
+        self.capture_logs()
+        cache = verification_config._JsonFileCache(self.path, 16)
+        cache.set("url", {"etag": "\"v2\""})
+        cache.save()
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f), {"url": {"etag": "\"v1\""}})
+        self.assertEqual(os.listdir(self.tmp_dir), ["cache.json"])
+
+
+class CallGithubApiEtagTest(VerificationTestMixin, unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.patch("_ETAG_CACHE", verification_config._JsonFileCache(os.path.join(tmp_dir.name, "etag.json"), 16))
+
+    def test_200_is_stored_and_304_returns_cached_body(self):
+        session = FakeApiSession([
+            FakeResponse(body=[{"sha": "c1"}], headers={"ETag": "\"v1\""}),
+            FakeResponse(status_code=304),
+        ])
+        first = verification_config.call_github_api("commits", session, "org", "repo")
+        second = verification_config.call_github_api("commits", session, "org", "repo")
+        self.assertEqual(first, (True, [{"sha": "c1"}]))
+        self.assertEqual(second, (True, [{"sha": "c1"}]))
+        self.assertNotIn("If-None-Match", session.sent_headers[0])
+        self.assertEqual(session.sent_headers[1]["If-None-Match"], "\"v1\"")
+
+    def test_raw_and_json_bodies_are_cached_separately(self):
+        raw = FakeResponse(headers={"ETag": "\"raw\""})
+        raw.content = "# 报告".encode("utf-8")
+        session = FakeApiSession([raw, FakeResponse(body={"type": "file"}, headers={"ETag": "\"json\""})])
+        media_type = verification_config._RAW_MEDIA_TYPE
+        verification_config.call_github_api("contents/docs/report.md", session, "org", "repo", media_type)
+        verification_config.call_github_api("contents/docs/report.md", session, "org", "repo")
+        self.assertEqual(session.sent_headers[0], {"Accept": media_type})
+        self.assertEqual(session.sent_headers[1], {})
+
+
+class FakeGraphQLSession:
+    """按当前history返回GraphQL提交列表的假会话"""
+
+    def __init__(self, history):
+        self.history = history
+        self.auth = None
+
+    def post(self, url, json=None, **kwargs):
+        nodes = self.history[:json["variables"]["first"]]
+        body = {"data": {"repository": {"defaultBranchRef": {"target": {"history": {"nodes": nodes}}}}}}
+        return FakeResponse(body=body)
+
+
+class SearchCommitsTest(unittest.TestCase):
+    def search(self, session, pattern="report", max_commits=2):
+        return verification_config.search_commits(session, "org", "repo", pattern, max_commits)
+
+    def test_rewritten_history_drops_cached_match(self):
+        session = FakeGraphQLSession([
+            {"oid": "c2", "message": "add report"},
+            {"oid": "c1", "message": "init"},
+        ])
+        self.assertTrue(self.search(session))
+
+        # 强制推送移除唯一匹配的提交
+        session.history = [
+            {"oid": "c3", "message": "fix typo"},
+            {"oid": "c1", "message": "init"},
+        ]
+        self.assertFalse(self.search(session))
+
+    def test_new_commits_beyond_window_are_rechecked(self):
+        session = FakeGraphQLSession([
+            {"oid": "c1", "message": "add report"},
+        ])
+        self.assertTrue(self.search(session, max_commits=1))
+
+        session.history = [{"oid": "c2", "message": "bump version"}] + session.history
+        self.assertFalse(self.search(session, max_commits=1))
+
+    def test_pattern_change_is_not_served_from_cache(self):
+        session = FakeGraphQLSession([{"oid": "c1", "message": "add report"}])
+        self.assertTrue(self.search(session))
+        self.assertFalse(self.search(session, pattern="release"))
+
+
+class VerifyFileStructureTest(VerificationTestMixin, unittest.TestCase):
+    def setUp(self):
+        self.errors = self.capture_logs(verification_config.logging.ERROR)
+
+    def test_default_reports_all_missing_structures(self):
+        config = {"required_structures": ["# 报告", "## 摘要", "## 结论"]}
+        self.assertFalse(verification_config.verify_file_structure("# 报告", config))
+        self.assertEqual(self.errors, ["[错误] 缺失必需结构：## 摘要, ## 结论"])
+
+
+class FindStructuresTest(unittest.TestCase):
+    CONTENT = "# 报告\n## 执行摘要\n| 指标 | 数值 |\nabcd\n"
+
+    def expected(self, structures):
+        return {struct for struct in structures if struct in self.CONTENT}
+
+    def test_regex_fallback_matches_substring_check(self):
+        cases = [
+            ["# 报告", "## 执行摘要", "## 结论"],
+            # 重叠：finditer只返回"abc"，"bcd"需由逐个确认补上
+            ["abc", "bcd", "cd"],
+            # 包含：长结构命中后，被其覆盖的短结构仍须计入
+            ["## 执行摘要", "执行摘要", "摘要", "| 指标 |", "指标"],
+            ["", "# 报告", "## 缺失"],
+            ["## 缺失"],
+            [""],
+        ]
+        for structures in cases:
+            with self.subTest(structures=structures):
+                self.assertEqual(
+                    verification_config._find_structures_regex(self.CONTENT, structures), self.expected(structures)
+                )
+
+    def test_find_structures_matches_substring_check(self):
+        structures = ["abc", "bcd", "## 执行摘要", "摘要", "", "## 结论"]
+        self.assertEqual(verification_config.find_structures(self.CONTENT, structures), self.expected(structures))
+        self.assertEqual(verification_config.find_structures(self.CONTENT, []), set())
+
+
+class StatLinePatternTest(unittest.TestCase):
+    CONTENT = (
+        "a 5 总用户数 7\n总用户数 x\n| 总用户数 | 1000 |\r\n12 other\n总用户数: 3.5\n"
+        "Q3收入 120\n增长率(%) 8.25\n无数字 增长率(%)\n\n总用户数"
+    )
+
+    @staticmethod
+    def per_line_numbers(content, target):
+        """逐行实现的参照：含target的每一行取其首个数值"""
+        numbers = set()
+        for line in content.split("\n"):
+            if target in line:
+                match = verification_config.re.search(r"(\d+(?:\.\d+)?)", line)
+                if match:
+                    numbers.add(match.group(1))
+        return numbers
+
+    def test_matches_per_line_behaviour(self):
+        for target in ["总用户数", "Q3收入", "增长率(%)", "other", "|", "不存在"]:
+            with self.subTest(target=target):
+                pattern = verification_config._stat_line_pattern(target)
+                self.assertEqual(
+                    {match.group(1) for match in pattern.finditer(self.CONTENT)},
+                    self.per_line_numbers(self.CONTENT, target)
+                )
+
+    def test_verify_content_accuracy_uses_first_number_of_matching_line(self):
+        for expected, valid in [("5", True), ("7", False), ("1000", True), ("12", False), ("3.5", True)]:
+            with self.subTest(expected=expected):
+                rule = {"type": "stat_match", "target": "总用户数", "expected": expected}
+                self.assertEqual(
+                    verification_config.verify_content_accuracy(self.CONTENT, {"content_rules": [rule]}), valid
+                )
+
+    def test_pattern_is_compiled_once_per_target(self):
+        self.assertIs(
+            verification_config._stat_line_pattern("总用户数"), verification_config._stat_line_pattern("总用户数")
+        )
+
+
+class FakeContentSession:
+    """依次返回预设状态码的文件内容假会话"""
+
+    def __init__(self, statuses, content="# 报告".encode("utf-8")):
+        self.statuses = list(statuses)
+        self.content = content
+        self.calls = 0
+        self.auth = None
+
+    def get(self, url, headers=None, **kwargs):
+        self.calls += 1
+        status_code = self.statuses.pop(0)
+        response = FakeResponse(status_code=status_code)
+        response.content = self.content
+        return response
+
+
+class GetRepoFileContentTest(VerificationTestMixin, unittest.TestCase):
+    def fetch(self, session, file_cache, branch="main"):
+        return verification_config.get_repo_file_content(
+            "docs/report.md", session, "org", "repo", branch, file_cache
+        )
+
+    def test_failed_fetch_is_not_cached(self):
+        session = FakeContentSession([500, 200])
+        file_cache = {}
+        self.assertIsNone(self.fetch(session, file_cache))
+        self.assertEqual(file_cache, {})
+        self.assertEqual(self.fetch(session, file_cache), "# 报告")
+        self.assertEqual(session.calls, 2)
+
+    def test_successful_fetch_is_reused_within_run(self):
+        session = FakeContentSession([200])
+        file_cache = {}
+        for _ in range(2):
+            self.assertEqual(self.fetch(session, file_cache), "# 报告")
+        self.assertEqual(session.calls, 1)
+        self.assertEqual(list(file_cache), [("org", "repo", "docs/report.md", "main")])
+
+    def test_other_branch_or_new_run_fetches_again(self):
+        session = FakeContentSession([200, 200, 200])
+        file_cache = {}
+        self.fetch(session, file_cache)
+        self.fetch(session, file_cache, branch="dev")
+        self.fetch(session, {})
+        self.assertEqual(session.calls, 3)
+
+    def test_non_utf8_content_reports_decode_error(self):
+        errors = self.capture_logs(verification_config.logging.ERROR)
+        session = FakeContentSession([200], content="# 报告".encode("gbk"))
+        self.assertIsNone(self.fetch(session, {}))
+        self.assertEqual(len(errors), 1)
+        self.assertTrue(errors[0].startswith("[文件解码错误] docs/report.md："))
+
+
+class RotatingTokenAuthTest(VerificationTestMixin, unittest.TestCase):
+    def setUp(self):
+        self.sleeps = self.record_sleeps()
+
+    def authorize(self, session):
+        request = verification_config.requests.Request("GET", "https://api.github.com/rate_limit")
+        return session.prepare_request(request).headers["Authorization"]
+
+    def send_exhausting(self, session, status_code=200):
+        """发送一次请求，响应报告所用令牌额度已耗尽"""
+        authorization = self.authorize(session)
+        response = FakeResponse(status_code=status_code, headers={
+            "X-RateLimit-Remaining": "0",
+            "X-RateLimit-Reset": str(int(verification_config.time.time()) + 300),
+        })
+        response.request = verification_config.requests.Request(headers={"Authorization": authorization})
+        responses = [response, FakeResponse()]
+        return verification_config._send_with_rate_limit(session, lambda: responses.pop(0)), authorization
+
+    def test_exhausted_token_is_skipped_without_sleeping(self):
+        session = verification_config.build_session("token-a,token-b")
+        response, used = self.send_exhausting(session)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(used, "Bearer token-a")
+        self.assertEqual(self.sleeps, [])
+        self.assertEqual(self.authorize(session), "Bearer token-b")
+        self.assertEqual(self.authorize(session), "Bearer token-b")
+        self.assertEqual(self.sleeps, [])
+
+    def test_sleeps_before_next_request_when_all_tokens_exhausted(self):
+        session = verification_config.build_session("token-a")
+        self.send_exhausting(session)
+        self.assertEqual(self.sleeps, [])
+        self.authorize(session)
+        self.assertEqual(len(self.sleeps), 1)
+        self.assertGreater(self.sleeps[0], 290)
+
+    def test_wait_beyond_cap_fails_without_sending(self):
+        session = verification_config.build_session("token-a")
+        sent = []
+        session.send = lambda request, **kwargs: sent.append(request)
+        session.auth.mark_exhausted(
+            "Bearer token-a", verification_config.time.time() + verification_config._RATE_LIMIT_MAX_WAIT + 60
+        )
+        errors = self.capture_logs(verification_config.logging.ERROR)
+        self.assertEqual(verification_config.call_github_api("commits", session, "org", "repo"), (False, None))
+        self.assertEqual(
+            verification_config.call_github_graphql("query { viewer { login } }", {}, session), (False, None)
+        )
+        self.assertEqual(sent, [])
+        self.assertEqual(self.sleeps, [])
+        self.assertEqual(len(errors), 2)
+        self.assertTrue(all("所有令牌额度耗尽" in message for message in errors))
+
+
+class SendWithRateLimitTest(VerificationTestMixin, unittest.TestCase):
+    def setUp(self):
+        self.sleeps = self.record_sleeps()
+
+    def test_limited_response_is_closed_before_retry(self):
+        limited = FakeResponse(status_code=429, headers={"Retry-After": "0"})
+        retried = FakeResponse()
+        responses = [limited, retried]
+
+        def send():
+            if len(responses) == 1:
+                self.assertTrue(limited.closed)
+            return responses.pop(0)
+
+        session = verification_config.requests.Session()
+        self.assertIs(verification_config._send_with_rate_limit(session, send), retried)
+        self.assertTrue(limited.closed)
+
+    def test_successful_response_returns_without_sleeping(self):
+        exhausted = FakeResponse(headers={
+            "X-RateLimit-Remaining": "0",
+            "X-RateLimit-Reset": str(int(verification_config.time.time()) + 300),
+        })
+        session = verification_config.requests.Session()
+        self.assertIs(verification_config._send_with_rate_limit(session, lambda: exhausted), exhausted)
+        self.assertEqual(self.sleeps, [])
+
+
+class RunVerificationOneTest(VerificationTestMixin, unittest.TestCase):
+    CONFIG = {
+        "target_repo": "repo",
+        "target_file": {"path": "docs/report.md", "branch": "main"},
+        "required_structures": ["# 报告"],
+        "content_rules": [],
+        "commit_verification": {"msg_pattern": "report", "max_commits": 2},
+    }
+
+    def setUp(self):
+        self.messages = self.capture_logs()
+        self.release_search = verification_config.threading.Event()
+        self.addCleanup(self.release_search.set)
+        self.patch("get_repo_file_content", lambda *args: self.file_content)
+        self.patch("search_commits", self.fake_search_commits)
+
+    def fake_search_commits(self, *args):
+        verification_config.logger.warning("[GraphQL提示] 回退REST接口获取提交记录")
+        self.release_search.wait(5)
+        return True
+
+    def test_commit_search_logs_follow_earlier_steps(self):
+        self.file_content = "# 报告"
+        self.release_search.set()
+        self.assertTrue(verification_config.run_verification_one(self.CONFIG, None, "org"))
+        graphql_index = self.messages.index("[GraphQL提示] 回退REST接口获取提交记录")
+        step_three = next(i for i, m in enumerate(self.messages) if m.startswith("[3/4"))
+        step_four = next(i for i, m in enumerate(self.messages) if m.startswith("[4/4]"))
+        self.assertGreater(graphql_index, step_three)
+        self.assertGreater(graphql_index, step_four)
+
+    def test_missing_file_does_not_wait_for_commit_search(self):
+        self.file_content = None
+        started = verification_config.time.monotonic()
+        self.assertFalse(verification_config.run_verification_one(self.CONFIG, None, "org"))
+        self.assertLess(verification_config.time.monotonic() - started, 2)
+        self.assertNotIn("[GraphQL提示] 回退REST接口获取提交记录", self.messages)
+
+
+class RunVerificationBatchTest(VerificationTestMixin, unittest.TestCase):
+    def setUp(self):
+        self.messages = self.capture_logs()
+        self.patch("check_environment", lambda: ("token", "org"))
+        self.patch("save_caches", lambda: None)
+        self.patch("run_verification_one", self.fake_run_verification_one)
+
+    def fake_run_verification_one(self, config, session, github_org, file_cache=None):
+        repo_name = config["target_repo"]
+        if repo_name == "broken":
+            raise ValueError("bad config")
+        for step in range(3):
+            verification_config.logger.info(f"{repo_name} step {step}")
+            verification_config.time.sleep(0.01)
+        return True
+
+    def test_exception_in_one_config_does_not_discard_others(self):
+        configs = [{"target_repo": "a"}, {"target_repo": "broken"}, {"target_repo": "b"}]
+        self.assertEqual(verification_config.run_verification_batch(configs, max_workers=3), [True, False, True])
+        self.assertTrue(any("org/broken" in message and "bad config" in message for message in self.messages))
+
+    def test_session_is_closed_after_run(self):
+        closed = []
+
+        def build_session(*args, **kwargs):
+            session = verification_config.requests.Session()
+            session.close = lambda: closed.append(session)
+            return session
+
+        self.patch("build_session", build_session)
+        verification_config.run_verification_batch([{"target_repo": "a"}], max_workers=1)
+        self.assertEqual(len(closed), 1)
+
+        self.patch("run_verification_one", lambda *args: 1 / 0)
+        with self.assertRaises(ZeroDivisionError):
+            verification_config.run_verification({"target_repo": "a"})
+        self.assertEqual(len(closed), 2)
+
+    def test_each_repo_output_is_written_as_one_block(self):
+        configs = [{"target_repo": name} for name in ("a", "b", "c")]
+        verification_config.run_verification_batch(configs, max_workers=3)
+        repo_lines = [message.split()[0] for message in self.messages if " step " in message]
+        blocks = [name for index, name in enumerate(repo_lines) if index == 0 or repo_lines[index - 1] != name]
+        self.assertEqual(sorted(blocks), ["a", "b", "c"])
+
+
+if __name__ == "__main__":
+    unittest.main()